@@ -1,11 +1,14 @@
 import os
 import json
+import time
 import base64
+import threading
+import pymongo
 import requests
 from datetime import datetime
 from functools import wraps
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify, send_from_directory, g
+from flask import Flask, request, jsonify, send_from_directory, g, Response
 from flask_cors import CORS
 from pymongo import MongoClient
 from bson import ObjectId
@@ -17,9 +20,15 @@ load_dotenv('.env')
 # Import authentication services
 from auth_service import auth_service
 from token_service import token_service
+from metrics_service import metrics_service
+from health_service import health_service
+from response_service import response_service, FastJSONProvider
+from audit_service import audit_service
+from schedule_service import schedule_service
 
 # Flask app setup
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)
 
 # Configuration
@@ -36,6 +45,12 @@ app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 # Shopify Storefront API Configuration
 SHOPIFY_DOMAIN = os.getenv('NEXT_PUBLIC_SHOPIFY_DOMAIN') or os.getenv('VITE_SHOPIFY_DOMAIN')
 STOREFRONT_TOKEN = os.getenv('NEXT_PUBLIC_SHOPIFY_STOREFRONT_TOKEN') or os.getenv('VITE_SHOPIFY_STOREFRONT_TOKEN')
+# Optional full GraphQL endpoint override (e.g. a local mock server for benchmarks)
+SHOPIFY_API_URL = os.getenv('SHOPIFY_API_URL')
+# How long fetched collections (and their serialized response) are reused; 0 disables
+COLLECTIONS_CACHE_SECONDS = float(os.getenv('COLLECTIONS_CACHE_SECONDS', '30'))
+# After a failed fetch, how long callers get the stale list (or the error) instead of retrying Shopify
+COLLECTIONS_ERROR_CACHE_SECONDS = float(os.getenv('COLLECTIONS_ERROR_CACHE_SECONDS', '5'))
 
 # MongoDB Configuration
 MONGO_URI = os.getenv('MONGO_URI') or os.getenv('MONGO_DB_URL') or 'mongodb://localhost:27017/'
@@ -46,14 +61,98 @@ try:
     mongo_client.admin.command('ping')
     db = mongo_client[MONGO_DB]
     banners_collection = db['banners']
-    print("Connected to MongoDB successfully!")
+    metrics_service.log('mongo.connected', database=MONGO_DB)
 except Exception as e:
-    print(f"MongoDB connection error: {e}")
+    metrics_service.error('mongo.connection_error', error=str(e))
     db = None
 
+# History and scheduling are optional; their failure must not take the database down with them
+if db is not None:
+    try:
+        audit_service.start(db, banners_collection, UPLOAD_FOLDER)
+    except Exception as e:
+        metrics_service.error('audit.start_error', error=str(e))
+    try:
+        schedule_service.start(banners_collection)
+    except Exception as e:
+        metrics_service.error('schedule.start_error', error=str(e))
+
+# ==================== REQUEST INSTRUMENTATION ====================
+
+@app.before_request
+def start_request_timer():
+    """Assign a request ID and start the latency timer"""
+    g.request_id = metrics_service.request_id_from(request.headers.get('X-Request-ID'))
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Record per-route latency and emit a structured access log"""
+    start = g.get('request_start')
+    if start is None:
+        return response
+    
+    duration = time.perf_counter() - start
+    # Use the route template (e.g. /api/banners/<banner_id>) to keep label cardinality bounded
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics_service.observe('http_request_duration_seconds', duration, method=request.method, route=route)
+    metrics_service.inc('http_requests_total', method=request.method, route=route, status=response.status_code)
+    
+    response.headers['X-Request-ID'] = g.request_id
+    metrics_service.log(
+        'http.request',
+        method=request.method,
+        route=route,
+        path=request.path,
+        status=response.status_code,
+        durationMs=round(duration * 1000, 3)
+    )
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Negotiated gzip/brotli compression (runs before the metrics hook, so it is timed)"""
+    return response_service.compress(response)
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def parse_schedule(data, current=None):
+    """Read activeFrom/activeUntil (ISO 8601, UTC if no offset) from form/JSON data.
+    
+    Keys that are absent keep their value from `current`; empty/null clears them.
+    """
+    current = current or {}
+    schedule = {}
+    for key in ('activeFrom', 'activeUntil'):
+        if key in data:
+            try:
+                schedule[key] = schedule_service.parse_time(data.get(key))
+            except (TypeError, ValueError, OverflowError):
+                # OverflowError: an offset that pushes the date outside datetime's range
+                raise ValueError(f'Invalid {key}: expected an ISO 8601 date/time')
+        else:
+            schedule[key] = current.get(key)
+    
+    if schedule['activeFrom'] and schedule['activeUntil'] and schedule['activeUntil'] <= schedule['activeFrom']:
+        raise ValueError('activeUntil must be after activeFrom')
+    return schedule
+
+def banner_to_json(banner):
+    """Banner document -> API shape (string id, data URL instead of raw base64)"""
+    banner = dict(banner)
+    banner['_id'] = str(banner['_id'])
+    if 'imageData' in banner and 'imageType' in banner:
+        banner['imageUrl'] = f"data:image/{banner['imageType']};base64,{banner['imageData']}"
+    # Remove raw base64 data from response
+    banner.pop('imageData', None)
+    # Stored naive; send as explicit UTC so browsers don't read them as local time
+    for key in ('activeFrom', 'activeUntil'):
+        if key in banner:
+            banner[key] = schedule_service.format_time(banner[key])
+    banner['isActive'] = schedule_service.is_active(banner['_id'])
+    return banner
+
 def require_auth(f):
     """Decorator to protect routes - requires valid JWT token"""
     @wraps(f)
@@ -81,16 +180,21 @@ def require_auth(f):
     
     return decorated_function
 
-def fetch_shopify_collections():
-    """Fetch collections from Shopify API"""
+def shopify_endpoint():
+    """Return the Storefront GraphQL URL and request headers"""
     if not SHOPIFY_DOMAIN or not STOREFRONT_TOKEN:
         raise ValueError('Missing Shopify Storefront credentials. Set VITE_SHOPIFY_DOMAIN and VITE_SHOPIFY_STOREFRONT_TOKEN in .env.')
     
-    url = f"https://{SHOPIFY_DOMAIN}/api/2024-01/graphql.json"
+    url = SHOPIFY_API_URL or f"https://{SHOPIFY_DOMAIN}/api/2024-01/graphql.json"
     headers = {
         'X-Shopify-Storefront-Access-Token': STOREFRONT_TOKEN,
         'Content-Type': 'application/json'
     }
+    return url, headers
+
+def fetch_shopify_collections():
+    """Fetch collections from Shopify API"""
+    url, headers = shopify_endpoint()
     
     query = """
     {
@@ -123,9 +227,10 @@ def fetch_shopify_collections():
         last_error = None
         for attempt in range(2):
             try:
-                response = requests.post(url, json={'query': query}, headers=headers, timeout=30)
-                response.raise_for_status()
-                data = response.json()
+                with metrics_service.time_dependency('shopify', 'collections'):
+                    response = requests.post(url, json={'query': query}, headers=headers, timeout=30)
+                    response.raise_for_status()
+                    data = response.json()
                 break
             except requests.exceptions.RequestException as e:
                 last_error = e
@@ -133,7 +238,7 @@ def fetch_shopify_collections():
                     raise
         
         if 'errors' in data:
-            print(f"Shopify API errors: {data['errors']}")
+            metrics_service.error('shopify.api_errors', errors=data['errors'])
             return []
         
         edges = data.get('data', {}).get('collections', {}).get('edges', [])
@@ -152,9 +257,111 @@ def fetch_shopify_collections():
         
         return collections
     except Exception as e:
-        print(f"Error fetching Shopify collections: {e}")
+        metrics_service.error('shopify.fetch_error', error=str(e))
         raise
 
+_collections_cache = {
+    'collections': None, 'body': None, 'etag': None, 'fetchedAt': 0.0,
+    'generation': 0, 'refreshing': False, 'error': None, 'errorAt': 0.0
+}
+_collections_cond = threading.Condition()
+
+def get_cached_collections(force=False):
+    """Collections plus their pre-serialized response body and ETag, refreshed every COLLECTIONS_CACHE_SECONDS.
+    
+    One caller refreshes (outside the lock) while the others keep getting the
+    stale list; a failed refresh is remembered for COLLECTIONS_ERROR_CACHE_SECONDS.
+    `force` skips the TTL, but is satisfied by any refresh that completes after the call.
+    """
+    cache = _collections_cache
+    with _collections_cond:
+        seen = cache['generation']
+        while True:
+            has_data = cache['collections'] is not None
+            age = time.monotonic() - cache['fetchedAt']
+            if has_data and (cache['generation'] != seen or (not force and age < COLLECTIONS_CACHE_SECONDS)):
+                metrics_service.record_cache('shopify_collections', True)
+                return dict(cache)
+            if cache['error'] is not None and time.monotonic() - cache['errorAt'] < COLLECTIONS_ERROR_CACHE_SECONDS:
+                metrics_service.record_cache('shopify_collections', has_data)
+                if has_data:
+                    return dict(cache)
+                raise cache['error']
+            if not cache['refreshing']:
+                cache['refreshing'] = True
+                break
+            if has_data and not force:
+                # Someone else is refreshing: serve stale rather than queue
+                metrics_service.record_cache('shopify_collections', True)
+                return dict(cache)
+            _collections_cond.wait()
+    
+    metrics_service.record_cache('shopify_collections', False)
+    try:
+        collections = fetch_shopify_collections()
+        body = app.json.dumps({'collections': collections}).encode('utf-8')
+    except Exception as e:
+        with _collections_cond:
+            cache.update({'error': e, 'errorAt': time.monotonic(), 'refreshing': False})
+            _collections_cond.notify_all()
+            if cache['collections'] is not None:
+                return dict(cache)
+        raise
+    
+    with _collections_cond:
+        cache.update({
+            'collections': collections,
+            'body': body,
+            'etag': response_service.etag_for(body),
+            'fetchedAt': time.monotonic(),
+            'generation': cache['generation'] + 1,
+            'refreshing': False,
+            'error': None
+        })
+        _collections_cond.notify_all()
+        return dict(cache)
+
+def find_collection(collection_id):
+    """Look up a collection by id; an id missing from the cached list triggers one fresh fetch"""
+    collections = get_cached_collections()['collections']
+    collection = next((c for c in collections if c['id'] == collection_id), None)
+    if collection is None:
+        collections = get_cached_collections(force=True)['collections']
+        collection = next((c for c in collections if c['id'] == collection_id), None)
+    return collection
+
+# ==================== READINESS PROBES ====================
+
+def ping_mongo(timeout):
+    """Readiness probe: MongoDB ping"""
+    if db is None:
+        raise ConnectionError('Database not connected')
+    # pymongo.timeout also bounds server selection, which maxTimeMS does not
+    with metrics_service.time_dependency('mongo', 'ping'), pymongo.timeout(timeout):
+        mongo_client.admin.command('ping')
+
+def ping_shopify(timeout):
+    """Readiness probe: smallest possible Storefront query, bounded by an overall deadline"""
+    url, headers = shopify_endpoint()
+    deadline = time.monotonic() + timeout
+    with metrics_service.time_dependency('shopify', 'ping'):
+        # requests timeouts are per phase; split the budget and check the deadline while reading
+        response = requests.post(url, json={'query': '{ shop { name } }'}, headers=headers,
+                                 timeout=(timeout / 2, timeout / 2), stream=True)
+        with response:
+            response.raise_for_status()
+            chunks = []
+            for chunk in response.iter_content(chunk_size=8192):
+                health_service.remaining(deadline)
+                chunks.append(chunk)
+        data = json.loads(b''.join(chunks))
+    if 'errors' in data:
+        raise RuntimeError(f"Shopify API errors: {data['errors']}")
+
+health_service.register('mongo', ping_mongo)
+health_service.register('shopify', ping_shopify)
+health_service.register('smtp', auth_service.ping_smtp)
+
 # API Routes
 
 # ==================== AUTHENTICATION ROUTES ====================
@@ -189,14 +396,14 @@ def request_otp():
             }), 200
         
         except Exception as email_error:
-            print(f"Error sending email: {email_error}")
+            metrics_service.error('auth.email_error', error=str(email_error))
             return jsonify({
                 'error': 'Failed to send OTP email. Please try again.',
                 'details': str(email_error)
             }), 500
     
     except Exception as e:
-        print(f"Error in request_otp: {e}")
+        metrics_service.error('auth.request_otp_error', error=str(e))
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/auth/verify-otp', methods=['POST'])
@@ -231,7 +438,7 @@ def verify_otp():
         }), 200
     
     except Exception as e:
-        print(f"Error in verify_otp: {e}")
+        metrics_service.error('auth.verify_otp_error', error=str(e))
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/auth/verify-token', methods=['POST'])
@@ -273,8 +480,13 @@ def verify_token():
 def get_collections():
     """Get all Shopify collections"""
     try:
-        collections = fetch_shopify_collections()
-        return jsonify({'collections': collections})
+        cached = get_cached_collections()
+        if response_service.is_fresh(cached['etag']):
+            response = app.response_class(status=304)
+        else:
+            response = app.response_class(cached['body'], mimetype='application/json')
+        response.set_etag(cached['etag'], weak=True)
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -286,17 +498,25 @@ def get_banners():
         if db is None:
             return jsonify({'error': 'Database not connected'}), 500
         
-        banners = list(banners_collection.find().sort('createdAt', -1))
+        # Cheap version query first: answer conditional GETs without loading image data
+        with metrics_service.time_dependency('mongo', 'find_versions'):
+            versions = list(banners_collection.find({}, {'_id': 1, 'updatedAt': 1}).sort('createdAt', -1))
+        # isActive flags change when schedules fire, so the live set is part of the ETag
+        etag = response_service.etag_for(
+            ','.join(schedule_service.active_ids()),
+            *(f"{v['_id']}:{v.get('updatedAt')}" for v in versions)
+        )
+        if response_service.is_fresh(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            return response
         
-        # Convert ObjectId to string and reconstruct image URLs
-        for banner in banners:
-            banner['_id'] = str(banner['_id'])
-            if 'imageData' in banner and 'imageType' in banner:
-                banner['imageUrl'] = f"data:image/{banner['imageType']};base64,{banner['imageData']}"
-            # Remove raw base64 data from response
-            banner.pop('imageData', None)
+        with metrics_service.time_dependency('mongo', 'find'):
+            banners = list(banners_collection.find().sort('createdAt', -1))
         
-        return jsonify({'banners': banners})
+        response = jsonify({'banners': [banner_to_json(banner) for banner in banners]})
+        response.set_etag(etag, weak=True)
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -324,6 +544,11 @@ def upload_banner():
         if not allowed_file(file.filename):
             return jsonify({'error': 'Invalid file type. Allowed: png, jpg, jpeg, gif, webp'}), 400
         
+        try:
+            schedule = parse_schedule(request.form)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Read file and convert to base64
         file_data = file.read()
         if len(file_data) > MAX_FILE_SIZE:
@@ -334,8 +559,8 @@ def upload_banner():
         data_url = f"data:image/{file_extension};base64,{image_base64}"
         
         # Get collection details
-        collections = fetch_shopify_collections()
-        collection_title = next((c['title'] for c in collections if c['id'] == collection_id), collection_id)
+        collection = find_collection(collection_id)
+        collection_title = collection['title'] if collection else collection_id
         
         # Save to MongoDB
         banner_doc = {
@@ -343,11 +568,15 @@ def upload_banner():
             'imageType': file_extension,
             'collectionId': collection_id,
             'collectionTitle': collection_title,
+            **schedule,
             'createdAt': datetime.now(),
             'updatedAt': datetime.now()
         }
         
-        result = banners_collection.insert_one(banner_doc)
+        with metrics_service.time_dependency('mongo', 'insert_one'):
+            result = banners_collection.insert_one(banner_doc)
+        audit_service.record('create', result.inserted_id, dict(banner_doc))
+        schedule_service.upsert(banner_doc)
         banner_doc['_id'] = str(result.inserted_id)
         banner_doc['imageUrl'] = data_url
         # Don't send raw base64 back, only the data URL for display
@@ -359,6 +588,9 @@ def upload_banner():
                 'imageUrl': data_url,
                 'collectionId': banner_doc['collectionId'],
                 'collectionTitle': banner_doc['collectionTitle'],
+                'activeFrom': schedule_service.format_time(banner_doc['activeFrom']),
+                'activeUntil': schedule_service.format_time(banner_doc['activeUntil']),
+                'isActive': schedule_service.is_active(banner_doc['_id']),
                 'createdAt': banner_doc['createdAt'].isoformat(),
                 'updatedAt': banner_doc['updatedAt'].isoformat()
             }
@@ -376,7 +608,8 @@ def replace_banner(banner_id):
             return jsonify({'error': 'Database not connected'}), 500
         
         # Check if banner exists
-        existing_banner = banners_collection.find_one({'_id': ObjectId(banner_id)})
+        with metrics_service.time_dependency('mongo', 'find_one'):
+            existing_banner = banners_collection.find_one({'_id': ObjectId(banner_id)})
         if not existing_banner:
             return jsonify({'error': 'Banner not found'}), 404
         
@@ -397,22 +630,17 @@ def replace_banner(banner_id):
             return jsonify({'error': 'Collection ID is required'}), 400
         
         # Find collection info from Shopify
-        collections = fetch_shopify_collections()
-        collection = next((c for c in collections if c['id'] == collection_id), None)
+        collection = find_collection(collection_id)
         
         if not collection:
             return jsonify({'error': 'Collection not found'}), 404
         
-        # Delete old file if it exists
-        old_filename = existing_banner.get('filename')
-        if old_filename:
-            old_filepath = os.path.join(app.config['UPLOAD_FOLDER'], old_filename)
-            if os.path.exists(old_filepath):
-                os.remove(old_filepath)
+        # Keep the old file for rollback; it is pruned once outside the history retention window
+        audit_service.retire_upload(existing_banner.get('filename'))
         
         # Save new file
         filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
         filename = f"{timestamp}_{filename}"
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         file.save(filepath)
@@ -427,10 +655,13 @@ def replace_banner(banner_id):
             'updatedAt': datetime.now()
         }
         
-        banners_collection.update_one(
-            {'_id': ObjectId(banner_id)},
-            {'$set': update_doc}
-        )
+        with metrics_service.time_dependency('mongo', 'update_one'):
+            banners_collection.update_one(
+                {'_id': ObjectId(banner_id)},
+                {'$set': update_doc}
+            )
+        audit_service.record('replace', banner_id, {**existing_banner, **update_doc})
+        schedule_service.upsert({**existing_banner, **update_doc})
         
         return jsonify({
             'message': 'Banner replaced successfully',
@@ -452,26 +683,185 @@ def delete_banner(banner_id):
         if db is None:
             return jsonify({'error': 'Database not connected'}), 500
         
-        banner = banners_collection.find_one({'_id': ObjectId(banner_id)})
+        with metrics_service.time_dependency('mongo', 'find_one'):
+            banner = banners_collection.find_one({'_id': ObjectId(banner_id)})
         
         if not banner:
             return jsonify({'error': 'Banner not found'}), 404
         
         # Delete from database
-        banners_collection.delete_one({'_id': ObjectId(banner_id)})
+        with metrics_service.time_dependency('mongo', 'delete_one'):
+            banners_collection.delete_one({'_id': ObjectId(banner_id)})
+        audit_service.retire_upload(banner.get('filename'))
+        audit_service.record('delete', banner_id, banner)
+        schedule_service.remove(banner_id)
         
         return jsonify({'message': 'Banner deleted successfully'})
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/banners/<banner_id>/history', methods=['GET'])
+@require_auth
+def get_banner_history(banner_id):
+    """Get the change history of a banner (newest first)"""
+    try:
+        if db is None:
+            return jsonify({'error': 'Database not connected'}), 500
+        
+        limit = max(1, min(request.args.get('limit', 50, type=int), 500))
+        with metrics_service.time_dependency('mongo', 'find_history'):
+            history = audit_service.history(banner_id, limit)
+        
+        return jsonify({'history': history})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/banners/<banner_id>/rollback', methods=['POST'])
+@require_auth
+def rollback_banner(banner_id):
+    """Restore a banner to the state recorded by a history entry.
+    
+    For create/replace/rollback entries that is the state after the change;
+    for delete entries it is the state just before deletion (undelete).
+    """
+    try:
+        if db is None:
+            return jsonify({'error': 'Database not connected'}), 500
+        
+        data = request.get_json(silent=True) or {}
+        history_id = data.get('historyId')
+        if not history_id:
+            return jsonify({'error': 'History ID is required'}), 400
+        
+        with metrics_service.time_dependency('mongo', 'find_history'):
+            event = audit_service.get_event(banner_id, history_id)
+        if not event:
+            return jsonify({'error': 'History entry not found'}), 404
+        
+        try:
+            snapshot = audit_service.restore_snapshot(event)
+        except LookupError as e:
+            return jsonify({'error': str(e)}), 410
+        
+        with metrics_service.time_dependency('mongo', 'find_one'):
+            current = banners_collection.find_one({'_id': ObjectId(banner_id)}, {'filename': 1})
+        if current and current.get('filename') != snapshot.get('filename'):
+            # The displaced file stays around for rollback, like on replace/delete
+            audit_service.retire_upload(current.get('filename'))
+        
+        restored = {**snapshot, '_id': ObjectId(banner_id), 'updatedAt': datetime.now()}
+        with metrics_service.time_dependency('mongo', 'replace_one'):
+            banners_collection.replace_one({'_id': ObjectId(banner_id)}, restored, upsert=True)
+        audit_service.record('rollback', banner_id, restored, restoredFrom=event['_id'])
+        schedule_service.upsert(restored)
+        
+        return jsonify({
+            'message': 'Banner rolled back successfully',
+            'banner': banner_to_json(restored)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/banners/<banner_id>/schedule', methods=['PUT'])
+@require_auth
+def schedule_banner(banner_id):
+    """Set or clear a banner's activeFrom/activeUntil window"""
+    try:
+        if db is None:
+            return jsonify({'error': 'Database not connected'}), 500
+        
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        
+        with metrics_service.time_dependency('mongo', 'find_one'):
+            existing_banner = banners_collection.find_one({'_id': ObjectId(banner_id)})
+        if not existing_banner:
+            return jsonify({'error': 'Banner not found'}), 404
+        
+        try:
+            schedule = parse_schedule(data, existing_banner)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if all(schedule[key] == existing_banner.get(key) for key in schedule):
+            # Nothing changed: no write, no history event, same ETag
+            return jsonify({
+                'message': 'Banner schedule unchanged',
+                'banner': banner_to_json(existing_banner)
+            })
+        
+        update_doc = {**schedule, 'updatedAt': datetime.now()}
+        with metrics_service.time_dependency('mongo', 'update_one'):
+            banners_collection.update_one({'_id': ObjectId(banner_id)}, {'$set': update_doc})
+        
+        updated = {**existing_banner, **update_doc}
+        audit_service.record('schedule', banner_id, updated)
+        schedule_service.upsert(updated)
+        
+        return jsonify({
+            'message': 'Banner schedule updated successfully',
+            'banner': banner_to_json(updated)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/banners/active', methods=['GET'])
+def get_active_banners():
+    """Banners live right now (public, for the storefront).
+    
+    The live set comes from the in-memory schedule index; MongoDB is only
+    hit for the matching documents, by _id, and not at all on a 304.
+    """
+    try:
+        if db is None:
+            return jsonify({'error': 'Database not connected'}), 500
+        
+        entries = schedule_service.active_entries()
+        etag = response_service.etag_for(*(f'{banner_id}:{updated_at}' for banner_id, updated_at in entries))
+        if response_service.is_fresh(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+        
+        ids = [ObjectId(banner_id) for banner_id, _ in entries]
+        with metrics_service.time_dependency('mongo', 'find_active'):
+            docs = {str(doc['_id']): doc for doc in banners_collection.find({'_id': {'$in': ids}})}
+        
+        banners = [banner_to_json(docs[banner_id]) for banner_id, _ in entries if banner_id in docs]
+        response = jsonify({'banners': banners})
+        response.set_etag(etag, weak=True)
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'database': 'connected' if db else 'disconnected'
+        'database': 'connected' if db is not None else 'disconnected'
     })
 
+@app.route('/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({'status': 'alive'})
+
+@app.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness: probes MongoDB, Shopify and SMTP (results cached for a few seconds)"""
+    report = health_service.check()
+    response = jsonify(report)
+    response.status_code = 503 if report['status'] == 'not_ready' else 200
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics endpoint"""
+    return Response(metrics_service.render(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,274 @@
+import os
+import time
+import queue
+import atexit
+import logging
+import hashlib
+import threading
+from datetime import datetime, timezone
+from bson import ObjectId
+from dotenv import load_dotenv
+from flask import g, has_request_context
+from pymongo.errors import OperationFailure
+from metrics_service import metrics_service
+
+load_dotenv('.env')
+
+# MongoDB error code for an existing index with different options
+INDEX_OPTIONS_CONFLICT = 85
+
+class AuditService:
+    """Append-only banner history written in batches by a background thread.
+
+    Snapshots don't embed the base64 image: the writer stores each distinct
+    image once in `banner_images` (keyed by SHA-256) and leaves an `imageRef`.
+    """
+
+    def __init__(self):
+        self.batch_size = int(os.getenv('AUDIT_BATCH_SIZE', '100'))
+        self.flush_interval = float(os.getenv('AUDIT_FLUSH_INTERVAL', '1'))
+        self.retention_days = float(os.getenv('BANNER_HISTORY_RETENTION_DAYS', '90'))
+        self.prune_interval = float(os.getenv('AUDIT_PRUNE_INTERVAL', '3600'))
+        # Queued events keep their image alive until written, so the queue is bounded by bytes too
+        self.max_queue_bytes = int(os.getenv('AUDIT_QUEUE_MAX_BYTES', str(64 * 1024 * 1024)))
+        # How long reads wait for the caller's own pending writes before using what is stored
+        self.flush_timeout = float(os.getenv('AUDIT_FLUSH_TIMEOUT', '2'))
+
+        self._queue = queue.Queue(maxsize=int(os.getenv('AUDIT_QUEUE_SIZE', '10000')))
+        self._queued_bytes = 0
+        # Items are numbered when queued; the writer reports how far it has got
+        self._queued_seq = 0
+        self._written_seq = 0
+        self._written = threading.Condition()
+        self._bytes_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.history_collection = None
+        self.images_collection = None
+        self.retired_collection = None
+        self.banners_collection = None
+        self.upload_folder = None
+
+    def start(self, db, banners_collection, upload_folder):
+        """Create indexes and start the writer thread"""
+        self.history_collection = db['banner_history']
+        self.images_collection = db['banner_images']
+        self.retired_collection = db['retired_uploads']
+        self.banners_collection = banners_collection
+        self.upload_folder = upload_folder
+
+        retention_seconds = int(self.retention_days * 86400)
+        self.history_collection.create_index([('bannerId', 1), ('recordedAt', -1)])
+        # TTL indexes keep the history bounded; an image lives as long as the newest entry referencing it
+        self._ensure_ttl_index(self.history_collection, 'recordedAt', retention_seconds)
+        self._ensure_ttl_index(self.images_collection, 'lastReferencedAt', retention_seconds)
+
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    @staticmethod
+    def _ensure_ttl_index(collection, field, seconds):
+        """Create a TTL index, or update its expiry when the retention setting changed"""
+        try:
+            collection.create_index(field, expireAfterSeconds=seconds)
+        except OperationFailure as e:
+            if e.code != INDEX_OPTIONS_CONFLICT:
+                raise
+            collection.database.command(
+                'collMod', collection.name,
+                index={'keyPattern': {field: 1}, 'expireAfterSeconds': seconds}
+            )
+            metrics_service.log('audit.ttl_updated', collection=collection.name, expireAfterSeconds=seconds)
+
+    @property
+    def started(self):
+        return self._thread is not None
+
+    def _enqueue(self, kind, payload, size):
+        with self._bytes_lock:
+            if self._queued_bytes + size > self.max_queue_bytes:
+                return False
+            try:
+                # Numbering under the lock keeps queue order and sequence order the same
+                self._queue.put_nowait((self._queued_seq + 1, kind, payload, size))
+            except queue.Full:
+                return False
+            self._queued_seq += 1
+            self._queued_bytes += size
+            return True
+
+    def record(self, action, banner_id, snapshot, **details):
+        """Queue a history event; never blocks the request"""
+        if not self.started:
+            return None
+        event = {
+            **details,
+            '_id': ObjectId(),
+            'bannerId': ObjectId(banner_id),
+            'action': action,
+            'actor': g.get('admin_email') if has_request_context() else None,
+            'requestId': g.get('request_id') if has_request_context() else None,
+            'recordedAt': datetime.now(timezone.utc),
+            'snapshot': snapshot
+        }
+        if not self._enqueue('event', event, len(snapshot.get('imageData') or '') + 1024):
+            metrics_service.error('audit.dropped', action=action, bannerId=str(banner_id))
+        return event['_id']
+
+    def retire_upload(self, filename):
+        """Keep a replaced/deleted banner's file for rollback; it may be pruned once retention has passed.
+
+        Without a running writer nothing could roll back to the file, so it is
+        deleted right away.
+        """
+        if not filename:
+            return
+        if self.started and self._enqueue('retire', {'filename': filename, 'retiredAt': time.time()}, 256):
+            return
+        if self.started:
+            metrics_service.error('audit.dropped', action='retire', filename=filename)
+        filepath = os.path.join(self.upload_folder, filename)
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+    def flush(self, timeout=None):
+        """Wait until everything queued before this call is written; False on timeout"""
+        if not self.started:
+            return True
+        target = self._queued_seq
+        with self._written:
+            return self._written.wait_for(lambda: self._written_seq >= target, timeout)
+
+    def stop(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._stop.set()
+            self._thread.join(timeout=self.flush_interval + 5)
+
+    def _store_images(self, events):
+        """Swap snapshot images for an imageRef, storing each distinct image once"""
+        images = {}
+        for event in events:
+            image_data = event['snapshot'].get('imageData')
+            if image_data is None:
+                continue
+            image_ref = hashlib.sha256(image_data.encode('utf-8')).hexdigest()
+            images.setdefault(image_ref, image_data)
+            snapshot = {k: v for k, v in event['snapshot'].items() if k != 'imageData'}
+            snapshot['imageRef'] = image_ref
+            event['snapshot'] = snapshot
+        if not images:
+            return
+
+        now = datetime.now(timezone.utc)
+        with metrics_service.time_dependency('mongo', 'find'):
+            known = [doc['_id'] for doc in self.images_collection.find({'_id': {'$in': list(images)}}, {'_id': 1})]
+        missing = [
+            {'_id': image_ref, 'imageData': image_data, 'createdAt': now, 'lastReferencedAt': now}
+            for image_ref, image_data in images.items() if image_ref not in known
+        ]
+        if known:
+            with metrics_service.time_dependency('mongo', 'update_many'):
+                self.images_collection.update_many({'_id': {'$in': known}}, {'$set': {'lastReferencedAt': now}})
+        if missing:
+            with metrics_service.time_dependency('mongo', 'insert_many'):
+                self.images_collection.insert_many(missing, ordered=False)
+
+    def _write(self, batch):
+        events = [payload for _, kind, payload, _ in batch if kind == 'event']
+        retired = [payload for _, kind, payload, _ in batch if kind == 'retire']
+        try:
+            if events:
+                self._store_images(events)
+                with metrics_service.time_dependency('mongo', 'insert_many'):
+                    self.history_collection.insert_many(events, ordered=False)
+            for item in retired:
+                with metrics_service.time_dependency('mongo', 'update_one'):
+                    self.retired_collection.update_one(
+                        {'_id': item['filename']}, {'$set': {'retiredAt': item['retiredAt']}}, upsert=True
+                    )
+        except Exception as e:
+            metrics_service.error('audit.write_error', error=str(e), events=len(events))
+        finally:
+            with self._bytes_lock:
+                self._queued_bytes -= sum(size for _, _, _, size in batch)
+            with self._written:
+                self._written_seq = batch[-1][0]
+                self._written.notify_all()
+
+    def _run(self):
+        last_prune = time.monotonic()
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if batch:
+                self._write(batch)
+
+            if time.monotonic() - last_prune >= self.prune_interval:
+                last_prune = time.monotonic()
+                self.prune_retired_uploads()
+
+    def prune_retired_uploads(self):
+        """Delete files retired before the retention window that no live banner uses again.
+
+        Only files passed to retire_upload are candidates; nothing else in the
+        upload folder is touched.
+        """
+        try:
+            cutoff = time.time() - self.retention_days * 86400
+            expired = [doc['_id'] for doc in self.retired_collection.find({'retiredAt': {'$lt': cutoff}})]
+            if not expired:
+                return
+            in_use = {b.get('filename') for b in self.banners_collection.find({'filename': {'$in': expired}}, {'filename': 1})}
+            for filename in expired:
+                if filename in in_use:
+                    # Rolled back into use; it is retired again when displaced
+                    continue
+                filepath = os.path.join(self.upload_folder, filename)
+                if os.path.isfile(filepath):
+                    os.remove(filepath)
+                self.retired_collection.delete_one({'_id': filename})
+        except Exception as e:
+            metrics_service.error('audit.prune_error', error=str(e))
+
+    def _require_started(self):
+        if not self.started:
+            raise RuntimeError('Banner history is not available')
+
+    def _flush_for_read(self):
+        if not self.flush(self.flush_timeout):
+            metrics_service.log('audit.flush_timeout', level=logging.WARNING, queued=self._queue.qsize())
+
+    def history(self, banner_id, limit=50):
+        """Newest-first history for a banner, without image payloads"""
+        self._require_started()
+        self._flush_for_read()
+        cursor = self.history_collection.find(
+            {'bannerId': ObjectId(banner_id)},
+            {'snapshot.imageData': 0}
+        ).sort('recordedAt', -1).limit(limit)
+        return list(cursor)
+
+    def get_event(self, banner_id, history_id):
+        self._require_started()
+        self._flush_for_read()
+        return self.history_collection.find_one({'_id': ObjectId(history_id), 'bannerId': ObjectId(banner_id)})
+
+    def restore_snapshot(self, event):
+        """A history event's snapshot with its image resolved from imageRef"""
+        snapshot = dict(event['snapshot'])
+        image_ref = snapshot.pop('imageRef', None)
+        if image_ref is not None:
+            image = self.images_collection.find_one({'_id': image_ref})
+            if image is None:
+                raise LookupError('Image for this history entry has expired')
+            snapshot['imageData'] = image['imageData']
+        return snapshot
+
+# Create singleton instance
+audit_service = AuditService()
@@ -1,12 +1,14 @@
 import os
 import random
 import string
+import time
 import smtplib
 import json
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
+from metrics_service import metrics_service
 
 load_dotenv('.env')
 
@@ -19,6 +21,7 @@ class AuthService:
         self.smtp_port = int(os.getenv('SMTP_PORT', '587').strip('"'))
         self.smtp_user = os.getenv('SMTP_USER', '').strip('"')
         self.smtp_pass = os.getenv('SMTP_PASS', '').strip('"')
+        self.smtp_starttls = os.getenv('SMTP_STARTTLS', 'true').strip('"').lower() != 'false'
         
         # Load admin emails
         self.admin_emails = self._load_admin_emails()
@@ -37,7 +40,8 @@ class AuthService:
             admin_emails.append(email.lower())
             counter += 1
         
-        print(f"Loaded {len(admin_emails)} admin emails: {admin_emails}")
+        metrics_service.log('auth.admins_loaded', count=len(admin_emails),
+                            admins=[self._mask_email(email) if '@' in email else '***' for email in admin_emails])
         return admin_emails
     
     def is_admin(self, email):
@@ -77,7 +81,7 @@ class AuthService:
                 'email': self._mask_email(email)
             }
         except Exception as e:
-            print(f"Error sending OTP: {str(e)}")
+            metrics_service.error('auth.send_otp_error', error=str(e))
             return {
                 'success': False,
                 'message': f'Failed to send OTP: {str(e)}'
@@ -163,18 +167,41 @@ class AuthService:
             msg.attach(part)
             
             # Send via SMTP
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_pass)
-                server.send_message(msg)
+            with metrics_service.time_dependency('smtp', 'send'):
+                with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
+                    if self.smtp_starttls:
+                        server.starttls()
+                    server.login(self.smtp_user, self.smtp_pass)
+                    server.send_message(msg)
             
-            print(f"OTP sent successfully to {recipient_email}")
+            metrics_service.log('smtp.otp_sent', recipient=self._mask_email(recipient_email))
             return True
             
         except Exception as e:
-            print(f"SMTP Error: {str(e)}")
+            metrics_service.error('smtp.error', error=str(e))
             raise
     
+    def ping_smtp(self, timeout):
+        """Readiness probe: connect and issue NOOP, bounded by an overall deadline"""
+        if not self.smtp_host:
+            raise ValueError('SMTP_HOST is not configured')
+        
+        deadline = time.monotonic() + timeout
+        with metrics_service.time_dependency('smtp', 'noop'):
+            # Connect + greeting get half the budget, NOOP gets whatever is left
+            server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=timeout / 2)
+            try:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    raise TimeoutError('Probe deadline exceeded')
+                server.sock.settimeout(left)
+                code, message = server.noop()
+            finally:
+                # close() rather than quit(): no extra round trip past the deadline
+                server.close()
+        if code != 250:
+            raise smtplib.SMTPResponseException(code, message)
+    
     def verify_otp(self, email, otp):
         """Verify OTP for login"""
         email = email.lower()
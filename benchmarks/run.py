@@ -0,0 +1,334 @@
+"""Load-test the Flask backend against local stand-ins.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run --requests 2000 --concurrency 4 --output bench.json
+    python -m benchmarks.run --baseline bench.json   # print deltas vs. a previous run
+
+The report is JSON: per-operation p50/p95/p99 latency, throughput, peak RSS
+(with the in-memory Mongo stand-in's storage reported separately) and the
+dependency timings recorded by metrics_service.
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import resource
+import tempfile
+import threading
+import subprocess
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.standins import InMemoryMongoClient, MockShopifyServer, SMTPSink
+
+DEFAULT_MIX = 'login=5,list=40,list_conditional=20,upload=15,replace=10,delete=10'
+
+def parse_mix(spec):
+    mix = {}
+    for item in spec.split(','):
+        name, weight = item.split('=')
+        mix[name.strip()] = float(weight)
+    unknown = set(mix) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Unknown operations in mix: {', '.join(sorted(unknown))}")
+    return mix
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+@contextlib.contextmanager
+def quiet_app_output():
+    """Send the app's JSON logs (and stray prints) to /dev/null: keeps their cost, drops the noise"""
+    handlers = [h for h in logging.getLogger('multiyo').handlers if isinstance(h, logging.StreamHandler)]
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        previous = [handler.setStream(devnull) for handler in handlers]
+        try:
+            yield
+        finally:
+            for handler, stream in zip(handlers, previous):
+                handler.setStream(stream)
+
+# ==================== ENVIRONMENT ====================
+
+class Environment:
+    """Starts the stand-ins and imports the app wired against them"""
+
+    def __init__(self, args):
+        self.args = args
+        self.shopify = MockShopifyServer(
+            latency=args.shopify_latency_ms / 1000,
+            collections=args.collections,
+            products_per_collection=args.products
+        ).start()
+        self.smtp = SMTPSink().start()
+        self.admins = [f'bench-admin-{i}@example.com' for i in range(args.concurrency + 1)]
+
+        os.environ.update({
+            'SHOPIFY_API_URL': self.shopify.url,
+            'NEXT_PUBLIC_SHOPIFY_DOMAIN': 'bench.myshopify.com',
+            'NEXT_PUBLIC_SHOPIFY_STOREFRONT_TOKEN': 'bench-token',
+            'SMTP_HOST': self.smtp.host,
+            'SMTP_PORT': str(self.smtp.port),
+            'SMTP_USER': 'bench@example.com',
+            'SMTP_PASS': 'bench',
+            'SMTP_STARTTLS': 'false',
+            'JWT_SECRET_KEY': 'bench-secret',
+            'MONGO_DB': 'multiyo_bench',
+        })
+        for i, admin in enumerate(self.admins, start=1):
+            os.environ[f'ADMIN_{i}'] = admin
+
+        # app.py connects at import time, so the client must be swapped first
+        import pymongo
+        InMemoryMongoClient.latency = args.mongo_latency_ms / 1000
+        pymongo.MongoClient = InMemoryMongoClient
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            import app as app_module
+        self.app_module = app_module
+        self.upload_dir = tempfile.TemporaryDirectory(prefix='multiyo-bench-')
+        app_module.app.config['UPLOAD_FOLDER'] = self.upload_dir.name
+        app_module.audit_service.upload_folder = self.upload_dir.name
+        self.collection_ids = [c['id'] for c in app_module.fetch_shopify_collections()]
+
+    def close(self):
+        self.shopify.stop()
+        self.smtp.stop()
+        self.upload_dir.cleanup()
+
+# ==================== OPERATIONS ====================
+
+class Worker:
+    """One simulated admin session with its own test client"""
+
+    def __init__(self, env, admin, pool, pool_lock, seed):
+        self.env = env
+        self.admin = admin
+        self.client = env.app_module.app.test_client()
+        self.pool = pool
+        self.pool_lock = pool_lock
+        self.rng = random.Random(seed)
+        self.token = None
+        self.banners_etag = None
+
+    def headers(self):
+        return {'Authorization': f'Bearer {self.token}'}
+
+    def image(self):
+        return io.BytesIO(self.rng.randbytes(self.env.args.image_kb * 1024)), 'banner.png'
+
+    def login(self):
+        response = self.client.post('/api/auth/request-otp', json={'email': self.admin})
+        if response.status_code != 200:
+            return response.status_code
+        otp = self.env.smtp.last_otp(self.admin)
+        response = self.client.post('/api/auth/verify-otp', json={'email': self.admin, 'otp': otp})
+        if response.status_code == 200:
+            self.token = response.get_json()['token']
+        return response.status_code
+
+    def list(self):
+        return self.client.get('/api/banners', headers=self.headers()).status_code
+
+    def list_conditional(self):
+        """Dashboard poll: revalidate with the last ETag (304 when nothing changed)"""
+        headers = self.headers()
+        if self.banners_etag:
+            headers['If-None-Match'] = self.banners_etag
+        response = self.client.get('/api/banners', headers=headers)
+        self.banners_etag = response.headers.get('ETag', self.banners_etag)
+        return response.status_code
+
+    def upload(self):
+        response = self.client.post('/api/banners/upload', headers=self.headers(), data={
+            'banner': self.image(),
+            'collectionId': self.rng.choice(self.env.collection_ids)
+        }, content_type='multipart/form-data')
+        if response.status_code == 201:
+            with self.pool_lock:
+                self.pool.append(response.get_json()['banner']['_id'])
+        return response.status_code
+
+    def replace(self):
+        with self.pool_lock:
+            banner_id = self.rng.choice(self.pool) if self.pool else None
+        if banner_id is None:
+            return self.upload()
+        return self.client.put(f'/api/banners/{banner_id}/replace', headers=self.headers(), data={
+            'banner': self.image(),
+            'collectionId': self.rng.choice(self.env.collection_ids)
+        }, content_type='multipart/form-data').status_code
+
+    def delete(self):
+        with self.pool_lock:
+            banner_id = self.pool.pop(self.rng.randrange(len(self.pool))) if self.pool else None
+        if banner_id is None:
+            return self.upload()
+        return self.client.delete(f'/api/banners/{banner_id}', headers=self.headers()).status_code
+
+OPERATIONS = {
+    'login': Worker.login,
+    'list': Worker.list,
+    'list_conditional': Worker.list_conditional,
+    'upload': Worker.upload,
+    'replace': Worker.replace,
+    'delete': Worker.delete,
+}
+
+# ==================== RUNNER ====================
+
+def run(args):
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    env = Environment(args)
+    samples = {name: [] for name in OPERATIONS}
+    errors = {name: 0 for name in OPERATIONS}
+    samples_lock = threading.Lock()
+    pool, pool_lock = [], threading.Lock()
+
+    try:
+        with quiet_app_output():
+            seeder = Worker(env, env.admins[-1], pool, pool_lock, args.seed)
+            seeder.login()
+            for _ in range(args.seed_banners):
+                seeder.upload()
+
+        workers = [Worker(env, env.admins[i], pool, pool_lock, args.seed + i + 1) for i in range(args.concurrency)]
+        per_worker = [args.requests // args.concurrency + (1 if i < args.requests % args.concurrency else 0)
+                      for i in range(args.concurrency)]
+
+        def drive(worker, count):
+            worker.login()
+            for _ in range(count):
+                name = worker.rng.choices(names, weights)[0]
+                start = time.perf_counter()
+                status = OPERATIONS[name](worker)
+                elapsed = time.perf_counter() - start
+                with samples_lock:
+                    samples[name].append(elapsed)
+                    if status >= 400:
+                        errors[name] += 1
+
+        # The app logs one JSON line per request; keep that cost but not the noise
+        with quiet_app_output():
+            wall_start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                for future in [executor.submit(drive, w, n) for w, n in zip(workers, per_worker)]:
+                    future.result()
+            wall = time.perf_counter() - wall_start
+
+        dependency_series = env.app_module.metrics_service.snapshot('dependency_duration_seconds')
+        peak_rss = peak_rss_bytes()
+        standin_storage = env.app_module.mongo_client.storage_bytes()
+    finally:
+        env.close()
+
+    operations = {}
+    for name, values in samples.items():
+        if not values:
+            continue
+        values.sort()
+        operations[name] = {
+            'count': len(values),
+            'errors': errors[name],
+            'meanMs': round(sum(values) / len(values) * 1000, 3),
+            'p50Ms': round(percentile(values, 50) * 1000, 3),
+            'p95Ms': round(percentile(values, 95) * 1000, 3),
+            'p99Ms': round(percentile(values, 99) * 1000, 3),
+            'maxMs': round(values[-1] * 1000, 3),
+        }
+
+    dependencies = {}
+    for key, hist in sorted(dependency_series.items()):
+        labels = dict(key)
+        dependencies[f"{labels['dependency']}.{labels['operation']}"] = {
+            'count': hist['count'],
+            'meanMs': round(hist['sum'] / hist['count'] * 1000, 3) if hist['count'] else 0.0,
+        }
+
+    total = sum(op['count'] for op in operations.values())
+    return {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'config': {k: v for k, v in vars(args).items() if k not in ('output', 'baseline')},
+        'totalRequests': total,
+        'wallSeconds': round(wall, 3),
+        'throughputRps': round(total / wall, 2) if wall else None,
+        'peakRssBytes': peak_rss,
+        # Documents held by the in-memory Mongo stand-in (banners, history) at the end of the run;
+        # subtracting it gives an estimate of what the app itself used
+        'standinStorageBytes': standin_storage,
+        'appPeakRssBytes': peak_rss - standin_storage,
+        'operations': operations,
+        'dependencies': dependencies,
+    }
+
+def compare(report, baseline):
+    """Relative change (%) of the headline numbers against a previous report"""
+    def delta(new, old):
+        return round((new - old) / old * 100, 2) if old else None
+
+    result = {
+        'baselineRevision': baseline.get('revision'),
+        'throughputRps': delta(report['throughputRps'], baseline.get('throughputRps')),
+        'peakRssBytes': delta(report['peakRssBytes'], baseline.get('peakRssBytes')),
+        'appPeakRssBytes': delta(report['appPeakRssBytes'], baseline.get('appPeakRssBytes')),
+        'standinStorageBytes': delta(report['standinStorageBytes'], baseline.get('standinStorageBytes')),
+        'operations': {}
+    }
+    for name, stats in report['operations'].items():
+        old = baseline.get('operations', {}).get(name)
+        if old:
+            result['operations'][name] = {k: delta(stats[k], old.get(k)) for k in ('p50Ms', 'p95Ms', 'p99Ms')}
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help='total operations across all workers')
+    parser.add_argument('--concurrency', type=int, default=4, help='number of concurrent admin sessions')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'operation weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for reproducible traffic')
+    parser.add_argument('--seed-banners', type=int, default=20, help='banners uploaded before timing starts')
+    parser.add_argument('--image-kb', type=int, default=256, help='size of uploaded banner images')
+    parser.add_argument('--shopify-latency-ms', type=float, default=50.0, help='mock Shopify response delay')
+    parser.add_argument('--mongo-latency-ms', type=float, default=0.0, help='simulated MongoDB round trip')
+    parser.add_argument('--collections', type=int, default=20, help='collections returned by mock Shopify')
+    parser.add_argument('--products', type=int, default=50, help='products per mock collection')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--baseline', help='previous JSON report to compare against')
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['comparison'] = compare(report, json.load(f))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,391 @@
+"""Local stand-ins for MongoDB, the Shopify Storefront API and SMTP.
+
+These let the Flask backend run end to end without any external service,
+so benchmark numbers only depend on the code under test and on the
+latencies configured here.
+"""
+import re
+import json
+import time
+import email
+import threading
+import socketserver
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import bson
+from bson import ObjectId
+
+# ==================== MONGODB ====================
+
+def _matches(doc, query):
+    """Evaluate a (small) subset of the MongoDB query language"""
+    for key, condition in (query or {}).items():
+        value = doc.get(key)
+        if isinstance(condition, dict) and any(k.startswith('$') for k in condition):
+            for op, operand in condition.items():
+                if op == '$eq' and value != operand:
+                    return False
+                if op == '$ne' and value == operand:
+                    return False
+                if op == '$in' and value not in operand:
+                    return False
+                if op == '$exists' and (key in doc) != bool(operand):
+                    return False
+                if op in ('$lt', '$lte', '$gt', '$gte'):
+                    if value is None:
+                        return False
+                    if op == '$lt' and not value < operand:
+                        return False
+                    if op == '$lte' and not value <= operand:
+                        return False
+                    if op == '$gt' and not value > operand:
+                        return False
+                    if op == '$gte' and not value >= operand:
+                        return False
+        elif value != condition:
+            return False
+    return True
+
+class InMemoryCursor:
+    """Just enough of pymongo's Cursor for the app: sort, limit, iteration"""
+
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, key, direction=1):
+        self._docs.sort(key=lambda d: (d.get(key) is not None, d.get(key)), reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        if count:
+            self._docs = self._docs[:count]
+        return self
+
+    def __iter__(self):
+        return iter(self._docs)
+
+class InMemoryCollection:
+    """Thread-safe, dict-backed replacement for a pymongo Collection"""
+
+    def __init__(self, name, latency=0.0, database=None):
+        self.name = name
+        self.latency = latency
+        self.database = database
+        self._docs = {}
+        self._lock = threading.Lock()
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _project(self, doc, projection):
+        if not projection:
+            return dict(doc)
+        include = {k for k, v in projection.items() if v}
+        if include:
+            return {k: v for k, v in doc.items() if k in include or k == '_id'}
+        projected = {k: v for k, v in doc.items() if k not in projection}
+        # Dotted exclusions, e.g. {'snapshot.imageData': 0}
+        for path in (k for k in projection if '.' in k):
+            parent, child = path.split('.', 1)
+            if isinstance(projected.get(parent), dict):
+                projected[parent] = {k: v for k, v in projected[parent].items() if k != child}
+        return projected
+
+    def find(self, query=None, projection=None):
+        self._wait()
+        with self._lock:
+            docs = [self._project(d, projection) for d in self._docs.values() if _matches(d, query)]
+        return InMemoryCursor(docs)
+
+    def find_one(self, query=None, projection=None):
+        return next(iter(self.find(query, projection)), None)
+
+    def count_documents(self, query):
+        return sum(1 for _ in self.find(query))
+
+    def insert_one(self, doc):
+        self._wait()
+        doc.setdefault('_id', ObjectId())
+        with self._lock:
+            self._docs[doc['_id']] = dict(doc)
+        return SimpleNamespace(inserted_id=doc['_id'])
+
+    def insert_many(self, docs, ordered=True):
+        self._wait()
+        ids = []
+        with self._lock:
+            for doc in docs:
+                doc.setdefault('_id', ObjectId())
+                self._docs[doc['_id']] = dict(doc)
+                ids.append(doc['_id'])
+        return SimpleNamespace(inserted_ids=ids)
+
+    @staticmethod
+    def _apply(doc, update):
+        doc.update(update.get('$set', {}))
+        for key in update.get('$unset', {}):
+            doc.pop(key, None)
+
+    def update_one(self, query, update, upsert=False):
+        self._wait()
+        with self._lock:
+            for doc in self._docs.values():
+                if _matches(doc, query):
+                    self._apply(doc, update)
+                    return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+            if upsert:
+                # Only equality conditions seed the new document, as in MongoDB
+                doc = {k: v for k, v in query.items() if not isinstance(v, dict)}
+                doc.setdefault('_id', ObjectId())
+                self._apply(doc, update)
+                self._docs[doc['_id']] = doc
+                return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=doc['_id'])
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+
+    def update_many(self, query, update):
+        self._wait()
+        with self._lock:
+            matched = [doc for doc in self._docs.values() if _matches(doc, query)]
+            for doc in matched:
+                self._apply(doc, update)
+        return SimpleNamespace(matched_count=len(matched), modified_count=len(matched))
+
+    def replace_one(self, query, replacement, upsert=False):
+        self._wait()
+        with self._lock:
+            for key, doc in self._docs.items():
+                if _matches(doc, query):
+                    self._docs[key] = {**replacement, '_id': key}
+                    return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+            if upsert:
+                replacement.setdefault('_id', ObjectId())
+                self._docs[replacement['_id']] = dict(replacement)
+                return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=replacement['_id'])
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+
+    def delete_one(self, query):
+        self._wait()
+        with self._lock:
+            for key, doc in self._docs.items():
+                if _matches(doc, query):
+                    del self._docs[key]
+                    return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    def delete_many(self, query):
+        self._wait()
+        with self._lock:
+            doomed = [key for key, doc in self._docs.items() if _matches(doc, query)]
+            for key in doomed:
+                del self._docs[key]
+        return SimpleNamespace(deleted_count=len(doomed))
+
+    def create_index(self, keys, **kwargs):
+        return keys if isinstance(keys, str) else '_'.join(f'{k}_{d}' for k, d in keys)
+
+    def storage_bytes(self):
+        """BSON size of everything stored (what this stand-in adds to the process RSS)"""
+        with self._lock:
+            return sum(len(bson.encode(doc)) for doc in self._docs.values())
+
+class InMemoryDatabase:
+    def __init__(self, name, latency=0.0):
+        self.name = name
+        self.latency = latency
+        self._collections = {}
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = InMemoryCollection(name, self.latency, self)
+        return self._collections[name]
+
+    def list_collection_names(self):
+        return list(self._collections)
+
+    def storage_bytes(self):
+        return sum(collection.storage_bytes() for collection in self._collections.values())
+
+    def create_collection(self, name, **kwargs):
+        return self[name]
+
+    def command(self, name, *args, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return {'ok': 1.0}
+
+class InMemoryMongoClient:
+    """Drop-in for pymongo.MongoClient; `latency` simulates network round trips"""
+
+    latency = 0.0
+
+    def __init__(self, *args, **kwargs):
+        self._databases = {}
+        self.admin = self['admin']
+
+    def __getitem__(self, name):
+        if name not in self._databases:
+            self._databases[name] = InMemoryDatabase(name, self.latency)
+        return self._databases[name]
+
+    def storage_bytes(self):
+        return sum(database.storage_bytes() for database in self._databases.values())
+
+# ==================== SHOPIFY ====================
+
+def build_collections(count, products_per_collection):
+    """Build a Storefront API `collections` payload"""
+    edges = []
+    for i in range(count):
+        edges.append({'node': {
+            'id': f'gid://shopify/Collection/{1000 + i}',
+            'title': f'Collection {i}',
+            'handle': f'collection-{i}',
+            'description': f'Benchmark collection {i}',
+            'image': {'url': f'https://cdn.example.com/collection-{i}.jpg', 'altText': None},
+            'products': {'edges': [
+                {'node': {'id': f'gid://shopify/Product/{i * 1000 + p}'}}
+                for p in range(products_per_collection)
+            ]}
+        }})
+    return {'data': {'collections': {'edges': edges}}}
+
+class MockShopifyServer:
+    """Local GraphQL endpoint answering the collections query after a fixed delay"""
+
+    def __init__(self, latency=0.05, collections=20, products_per_collection=50, host='127.0.0.1'):
+        self.latency = latency
+        self.payload = json.dumps(build_collections(collections, products_per_collection)).encode('utf-8')
+        self.requests = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                self.rfile.read(length)
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(server.payload)))
+                self.end_headers()
+                self.wfile.write(server.payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/api/2024-01/graphql.json'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+# ==================== SMTP ====================
+
+OTP_PATTERN = re.compile(r'class="otp-box">\s*(\d+)\s*<')
+
+class SMTPSink:
+    """Minimal SMTP server that accepts every message and keeps it in memory.
+
+    Advertises AUTH PLAIN (accepting any credentials) and no STARTTLS, so the
+    app must run with SMTP_STARTTLS=false.
+    """
+
+    def __init__(self, host='127.0.0.1'):
+        self.messages = []
+        self._lock = threading.Lock()
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode('ascii') + b'\r\n')
+
+            def handle(self):
+                self.reply('220 localhost SMTP sink ready')
+                recipients = []
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode('ascii', 'replace').strip()
+                    verb = command.split(' ', 1)[0].upper()
+                    if verb == 'EHLO':
+                        self.wfile.write(b'250-localhost\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n')
+                    elif verb == 'AUTH':
+                        self.reply('235 2.7.0 Authentication successful')
+                    elif verb == 'RCPT':
+                        recipients.append(command.split(':', 1)[1].strip().strip('<>').lower())
+                        self.reply('250 OK')
+                    elif verb == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        chunks = []
+                        for data_line in self.rfile:
+                            if data_line in (b'.\r\n', b'.\n'):
+                                break
+                            chunks.append(data_line[1:] if data_line.startswith(b'..') else data_line)
+                        sink._store(recipients, b''.join(chunks))
+                        recipients = []
+                        self.reply('250 OK')
+                    elif verb == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    elif verb in ('HELO', 'MAIL', 'RSET', 'NOOP'):
+                        recipients = [] if verb == 'RSET' else recipients
+                        self.reply('250 OK')
+                    else:
+                        self.reply('502 Command not implemented')
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+
+        self._server = Server((host, 0), Handler)
+        self._thread = None
+
+    @property
+    def host(self):
+        return self._server.server_address[0]
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def _store(self, recipients, raw):
+        with self._lock:
+            self.messages.append({'to': recipients, 'raw': raw})
+
+    def last_otp(self, recipient):
+        """Extract the OTP from the newest message sent to `recipient`"""
+        with self._lock:
+            raw = next((m['raw'] for m in reversed(self.messages) if recipient.lower() in m['to']), None)
+        if raw is None:
+            return None
+        for part in email.message_from_bytes(raw).walk():
+            if part.get_content_type() == 'text/html':
+                match = OTP_PATTERN.search(part.get_payload(decode=True).decode('utf-8', 'replace'))
+                if match:
+                    return match.group(1)
+        return None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
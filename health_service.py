@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import smtplib
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import requests
+from dotenv import load_dotenv
+from pymongo.errors import PyMongoError, ConnectionFailure
+from metrics_service import metrics_service
+
+load_dotenv('.env')
+
+class HealthService:
+    """Readiness checks: time-boxed dependency probes with a short-lived result cache"""
+
+    def __init__(self):
+        self.cache_seconds = float(os.getenv('HEALTH_CACHE_SECONDS', '5'))
+        self.probe_timeout = float(os.getenv('HEALTH_PROBE_TIMEOUT', '2'))
+        # Dependencies whose failure marks the instance degraded rather than not ready
+        self.optional = {
+            name.strip() for name in os.getenv('HEALTH_OPTIONAL_DEPENDENCIES', 'smtp').split(',') if name.strip()
+        }
+
+        self.probes = {}
+        # Probes still running from an earlier check (name -> Future)
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._cached = None
+        self._cached_at = 0.0
+
+    def register(self, name, probe):
+        """Register a probe: a callable taking a timeout (seconds) that raises on failure"""
+        self.probes[name] = probe
+
+    @staticmethod
+    def error_code(error):
+        """Short, non-sensitive failure class for the public report (details go to the log)"""
+        cause = error
+        while cause is not None:
+            if isinstance(cause, ConnectionRefusedError):
+                return 'connection_refused'
+            cause = cause.__cause__ or cause.__context__
+        if isinstance(error, (TimeoutError, requests.Timeout)) or (isinstance(error, PyMongoError) and error.timeout):
+            return 'timeout'
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return f'http_{error.response.status_code}'
+        if isinstance(error, smtplib.SMTPResponseException):
+            return f'smtp_{error.smtp_code}'
+        if isinstance(error, (ConnectionError, requests.ConnectionError, ConnectionFailure, smtplib.SMTPServerDisconnected)):
+            return 'connection_error'
+        if isinstance(error, json.JSONDecodeError):
+            return 'invalid_response'
+        if isinstance(error, ValueError):
+            return 'not_configured'
+        return 'error'
+
+    @staticmethod
+    def remaining(deadline):
+        """Seconds left until a time.monotonic() deadline; raises once it has passed"""
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise TimeoutError('Probe deadline exceeded')
+        return left
+
+    def _start(self, name, probe):
+        """Run a probe on its own thread, reusing the previous run if it hasn't finished yet.
+
+        A hung probe therefore never holds more than one thread and can't starve the others.
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(name)
+            if future is not None:
+                return future
+            future = self._inflight[name] = Future()
+
+        def run():
+            try:
+                future.set_result(self._timed(name, probe))
+            finally:
+                with self._inflight_lock:
+                    self._inflight.pop(name, None)
+
+        threading.Thread(target=run, name=f'health-probe-{name}', daemon=True).start()
+        return future
+
+    def _timed(self, name, probe):
+        start = time.perf_counter()
+        try:
+            # Leave headroom so a probe reports its own error before the outer deadline
+            probe(self.probe_timeout * 0.9)
+            return {'status': 'up', 'latencyMs': round((time.perf_counter() - start) * 1000, 3)}
+        except Exception as e:
+            # The readiness endpoint is public: hosts, ports and URLs stay in the log
+            code = self.error_code(e)
+            metrics_service.error('health.probe_failed', dependency=name, code=code, error=str(e))
+            return {'status': 'down', 'error': code, 'latencyMs': round((time.perf_counter() - start) * 1000, 3)}
+
+    def _run_probes(self):
+        """Run all probes concurrently, each bounded by probe_timeout"""
+        futures = {name: self._start(name, probe) for name, probe in self.probes.items()}
+        deadline = time.perf_counter() + self.probe_timeout
+
+        dependencies = {}
+        for name, future in futures.items():
+            try:
+                dependencies[name] = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+            except FutureTimeoutError:
+                metrics_service.error('health.probe_failed', dependency=name, code='timeout',
+                                      error=f'Timed out after {self.probe_timeout}s')
+                dependencies[name] = {
+                    'status': 'down',
+                    'error': 'timeout',
+                    'latencyMs': round(self.probe_timeout * 1000, 3)
+                }
+            dependencies[name]['optional'] = name in self.optional
+
+        down = {name for name, result in dependencies.items() if result['status'] != 'up'}
+        if down - self.optional:
+            status = 'not_ready'
+        elif down:
+            status = 'degraded'
+        else:
+            status = 'ready'
+
+        return {
+            'status': status,
+            'checkedAt': datetime.now(timezone.utc).isoformat(),
+            'dependencies': dependencies
+        }
+
+    def check(self):
+        """Return the readiness report, re-probing at most once per cache window"""
+        with self._lock:
+            fresh = self._cached is not None and time.monotonic() - self._cached_at < self.cache_seconds
+            metrics_service.record_cache('health', fresh)
+            if not fresh:
+                self._cached = self._run_probes()
+                self._cached_at = time.monotonic()
+
+            return {
+                **self._cached,
+                'cached': fresh,
+                'ageSeconds': round(time.monotonic() - self._cached_at, 3)
+            }
+
+# Create singleton instance
+health_service = HealthService()
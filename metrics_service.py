@@ -0,0 +1,162 @@
+import re
+import json
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from flask import g, has_request_context
+
+# Default latency buckets (seconds), same as the Prometheus client defaults
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+# Client-supplied request IDs are echoed into logs and headers, so keep them tame
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9-]{1,64}$')
+
+class JSONLogFormatter(logging.Formatter):
+    """One JSON object per log line: ts, level, event plus structured fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname.lower(),
+            'event': record.getMessage(),
+            **getattr(record, 'fields', {})
+        }
+        return json.dumps(entry, default=str)
+
+logger = logging.getLogger('multiyo')
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(JSONLogFormatter())
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+class MetricsService:
+    """In-process metrics registry exposed in Prometheus text format"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # name -> {'help': str, 'type': 'counter'|'histogram', 'series': {labels: value}}
+        self._metrics = {}
+
+        self._register('http_request_duration_seconds', 'histogram', 'Request latency per route')
+        self._register('http_requests_total', 'counter', 'Requests per route and status')
+        self._register('dependency_duration_seconds', 'histogram', 'Latency of upstream dependency calls')
+        self._register('dependency_errors_total', 'counter', 'Failed upstream dependency calls')
+        self._register('cache_requests_total', 'counter', 'Cache lookups by result (hit/miss)')
+
+    def _register(self, name, metric_type, help_text):
+        self._metrics[name] = {'help': help_text, 'type': metric_type, 'series': {}}
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted(labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        """Increment a counter"""
+        key = self._key(labels)
+        with self._lock:
+            series = self._metrics[name]['series']
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        """Record a value in a histogram"""
+        key = self._key(labels)
+        with self._lock:
+            series = self._metrics[name]['series']
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    hist['buckets'][i] += 1
+            hist['sum'] += value
+            hist['count'] += 1
+
+    @contextmanager
+    def time_dependency(self, dependency, operation, expected=()):
+        """Time an upstream call (shopify, mongo, smtp, jwt).
+
+        Exceptions listed in `expected` are normal outcomes (e.g. a rejected
+        token) and don't count as dependency errors.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except expected:
+            raise
+        except Exception:
+            self.inc('dependency_errors_total', dependency=dependency, operation=operation)
+            raise
+        finally:
+            self.observe('dependency_duration_seconds', time.perf_counter() - start,
+                         dependency=dependency, operation=operation)
+
+    def record_cache(self, cache, hit):
+        """Count a cache lookup as a hit or a miss"""
+        self.inc('cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+    def snapshot(self, name):
+        """Return a copy of a metric's series (for inspection/benchmarks)"""
+        with self._lock:
+            return {
+                key: (dict(value, buckets=list(value['buckets'])) if isinstance(value, dict) else value)
+                for key, value in self._metrics[name]['series'].items()
+            }
+
+    @staticmethod
+    def _format_labels(labels):
+        if not labels:
+            return ''
+        parts = []
+        for key, value in labels:
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            parts.append(f'{key}="{value}"')
+        return '{' + ','.join(parts) + '}'
+
+    def render(self):
+        """Render all metrics in Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, metric in self._metrics.items():
+                lines.append(f"# HELP {name} {metric['help']}")
+                lines.append(f"# TYPE {name} {metric['type']}")
+                for key, value in metric['series'].items():
+                    if metric['type'] == 'counter':
+                        lines.append(f"{name}{self._format_labels(key)} {value}")
+                        continue
+                    for bound, count in zip(self.buckets, value['buckets']):
+                        lines.append(f"{name}_bucket{self._format_labels(key + (('le', bound),))} {count}")
+                    lines.append(f"{name}_bucket{self._format_labels(key + (('le', '+Inf'),))} {value['count']}")
+                    lines.append(f"{name}_sum{self._format_labels(key)} {value['sum']}")
+                    lines.append(f"{name}_count{self._format_labels(key)} {value['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def new_request_id(self):
+        """Generate a request ID for log correlation"""
+        return uuid.uuid4().hex
+
+    def request_id_from(self, header_value):
+        """Reuse a client's X-Request-ID if it is short and safe, otherwise generate one"""
+        if header_value and REQUEST_ID_PATTERN.match(header_value):
+            return header_value
+        return self.new_request_id()
+
+    def log(self, event, level=logging.INFO, **fields):
+        """Write a structured JSON log line through the `multiyo` logger"""
+        if not logger.isEnabledFor(level):
+            return
+        if has_request_context() and 'request_id' in g:
+            fields.setdefault('requestId', g.request_id)
+        logger.log(level, event, extra={'fields': fields})
+
+    def error(self, event, **fields):
+        """Structured log line at ERROR level"""
+        self.log(event, level=logging.ERROR, **fields)
+
+# Create singleton instance
+metrics_service = MetricsService()
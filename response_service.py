@@ -0,0 +1,122 @@
+import os
+import gzip
+import hashlib
+from datetime import date, datetime
+from bson import ObjectId
+from dotenv import load_dotenv
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - gzip only
+    brotli = None
+
+load_dotenv('.env')
+
+def _json_default(obj):
+    """Serialize types the encoder doesn't handle natively"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (stdlib json if orjson isn't installed).
+
+    Datetimes are written as ISO 8601 and ObjectIds as strings.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            kwargs.setdefault('default', _json_default)
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_SORT_KEYS if self.sort_keys else 0
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_json_default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        # Skip the bytes -> str -> bytes round trip on the hot path (same argument rules as jsonify)
+        if args and kwargs:
+            raise TypeError('app.json.response() takes either args or kwargs, not both')
+        if kwargs:
+            obj = kwargs
+        elif len(args) == 1:
+            obj = args[0]
+        else:
+            obj = list(args) or None
+        option = orjson.OPT_APPEND_NEWLINE | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+        body = orjson.dumps(obj, default=_json_default, option=option)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+class ResponseService:
+    """Response compression and ETag helpers"""
+
+    def __init__(self):
+        self.min_size = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+        self.gzip_level = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+        self.brotli_quality = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '5'))
+        self.compressible_types = {
+            'application/json', 'text/plain', 'text/html', 'text/css',
+            'application/javascript', 'image/svg+xml'
+        }
+
+    def _negotiate(self):
+        """Pick the encoding with the highest client q-value (brotli wins ties)"""
+        offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+        return request.accept_encodings.best_match(offered)
+
+    def compress(self, response):
+        """Compress eligible responses according to Accept-Encoding"""
+        if (response.direct_passthrough
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in self.compressible_types):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self._negotiate()
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        if encoding == 'br':
+            response.set_data(brotli.compress(data, quality=self.brotli_quality))
+        else:
+            response.set_data(gzip.compress(data, compresslevel=self.gzip_level))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def etag_for(*parts):
+        """Build an ETag value from bytes/str parts"""
+        digest = hashlib.sha1()
+        for part in parts:
+            digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    @staticmethod
+    def is_fresh(etag):
+        """True if the request's If-None-Match already has this ETag"""
+        return request.if_none_match.contains_weak(etag)
+
+# Create singleton instance
+response_service = ResponseService()
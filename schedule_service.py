@@ -0,0 +1,240 @@
+import os
+import time
+import heapq
+import itertools
+import threading
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from metrics_service import metrics_service
+
+load_dotenv('.env')
+
+class ScheduleService:
+    """Banner activation windows (activeFrom/activeUntil) kept in memory.
+
+    Every banner's window is indexed by id; upcoming start/end transitions sit
+    in a min-heap. The active set is recomputed only when a transition fires
+    or a banner changes, so "which banners are live now" never hits MongoDB.
+    `clock` returns epoch seconds and can be swapped out in tests.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.reload_interval = float(os.getenv('SCHEDULE_RELOAD_SECONDS', '60'))
+
+        self._lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._seq = itertools.count()
+        self._generations = itertools.count()
+        # banner id -> {'start', 'end', 'createdAt', 'updatedAt', 'gen'}
+        self._windows = {}
+        # (time, seq, banner id, generation)
+        self._heap = []
+        # Ordered for responses, set for membership checks
+        self._active = ()
+        self._active_set = frozenset()
+        # Local changes since the last reload started: banner id -> version
+        self._version = 0
+        self._touched = {}
+        self.collection = None
+        self._thread = None
+
+    @staticmethod
+    def parse_time(value):
+        """Parse an ISO 8601 string into a naive UTC datetime (None/'' clears)"""
+        if value in (None, ''):
+            return None
+        if not isinstance(value, datetime):
+            value = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        # MongoDB stores milliseconds; truncate so a stored value compares equal to a re-parsed one
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+    @staticmethod
+    def format_time(value):
+        """Naive UTC datetime -> ISO 8601 with a 'Z' suffix (None stays None)"""
+        if value is None:
+            return None
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat() + 'Z'
+
+    @staticmethod
+    def _epoch(value):
+        # Naive datetimes are UTC, matching what pymongo returns
+        if value is None:
+            return None
+        return value.replace(tzinfo=timezone.utc).timestamp() if value.tzinfo is None else value.timestamp()
+
+    # ==================== INDEX MAINTENANCE ====================
+
+    def _add(self, doc, now):
+        banner_id = str(doc['_id'])
+        entry = {
+            'start': self._epoch(doc.get('activeFrom')),
+            'end': self._epoch(doc.get('activeUntil')),
+            'createdAt': doc.get('createdAt'),
+            'updatedAt': doc.get('updatedAt'),
+            # A fresh generation invalidates heap entries from any earlier window,
+            # including one from before the banner was removed and re-added
+            'gen': next(self._generations)
+        }
+        self._windows[banner_id] = entry
+        self._push(banner_id, entry, now)
+
+    def _push(self, banner_id, entry, now):
+        for moment in (entry['start'], entry['end']):
+            if moment is not None and moment > now:
+                heapq.heappush(self._heap, (moment, next(self._seq), banner_id, entry['gen']))
+
+    def _touch(self, banner_id):
+        self._version += 1
+        self._touched[banner_id] = self._version
+
+    def _refresh(self, now):
+        active = [
+            (banner_id, entry) for banner_id, entry in self._windows.items()
+            if (entry['start'] is None or entry['start'] <= now) and (entry['end'] is None or now < entry['end'])
+        ]
+        active.sort(key=lambda item: self._epoch(item[1]['createdAt']) or 0, reverse=True)
+        self._active_set = frozenset(banner_id for banner_id, _ in active)
+        self._active = tuple(banner_id for banner_id, _ in active)
+
+    def load(self, docs, since=None):
+        """Rebuild the whole index from banner documents.
+
+        With `since` (a version from begin_reload), banners upserted or removed
+        locally after that point keep their in-memory state, since `docs` may
+        have been read before those changes.
+        """
+        now = self.clock()
+        with self._lock:
+            newer = {} if since is None else {
+                banner_id: self._windows.get(banner_id)
+                for banner_id, version in self._touched.items() if version > since
+            }
+            self._windows = {}
+            self._heap = []
+            for doc in docs:
+                if str(doc['_id']) not in newer:
+                    self._add(doc, now)
+            for banner_id, entry in newer.items():
+                if entry is not None:
+                    self._windows[banner_id] = entry
+                    self._push(banner_id, entry, now)
+            self._touched = {banner_id: self._touched[banner_id] for banner_id in newer}
+            self._refresh(now)
+        self._wakeup.set()
+
+    def begin_reload(self):
+        """Version to pass to load() for documents read after this call"""
+        with self._lock:
+            return self._version
+
+    def upsert(self, doc):
+        """Index a created/updated banner"""
+        now = self.clock()
+        with self._lock:
+            self._add(doc, now)
+            self._touch(str(doc['_id']))
+            self._refresh(now)
+        self._wakeup.set()
+
+    def remove(self, banner_id):
+        now = self.clock()
+        with self._lock:
+            self._touch(str(banner_id))
+            if self._windows.pop(str(banner_id), None) is not None:
+                self._refresh(now)
+        self._wakeup.set()
+
+    def advance(self):
+        """Fire every transition that is due; returns True if the active set was refreshed"""
+        now = self.clock()
+        with self._lock:
+            fired = False
+            while self._heap and self._heap[0][0] <= now:
+                _, _, banner_id, gen = heapq.heappop(self._heap)
+                entry = self._windows.get(banner_id)
+                if entry is not None and entry['gen'] == gen:
+                    fired = True
+            if fired:
+                self._refresh(now)
+                metrics_service.log('schedule.transition', active=len(self._active))
+            return fired
+
+    # ==================== QUERIES ====================
+
+    def active_ids(self):
+        """Ids of banners live right now, newest first"""
+        self.advance()
+        return self._active
+
+    def active_entries(self):
+        """(id, updatedAt) pairs of live banners, e.g. for building an ETag"""
+        with self._lock:
+            return [(banner_id, self._windows[banner_id]['updatedAt']) for banner_id in self.active_ids()]
+
+    def is_active(self, banner_id):
+        """O(1) check against the live set as of the last advance()/change.
+
+        Doesn't advance itself: request handlers call active_ids() (or
+        advance()) once and then check each banner against that snapshot.
+        """
+        return str(banner_id) in self._active_set
+
+    def seconds_until_next(self):
+        """Time until the next pending transition, or None"""
+        with self._lock:
+            while self._heap:
+                moment, _, banner_id, gen = self._heap[0]
+                entry = self._windows.get(banner_id)
+                if entry is not None and entry['gen'] == gen:
+                    return max(0.0, moment - self.clock())
+                heapq.heappop(self._heap)
+        return None
+
+    # ==================== BACKGROUND SCHEDULER ====================
+
+    def start(self, collection):
+        """Load schedules from MongoDB and start the transition thread"""
+        self.collection = collection
+        self.reload()
+        self._thread = threading.Thread(target=self._run, name='banner-scheduler', daemon=True)
+        self._thread.start()
+
+    def reload(self):
+        """Full re-sync, picks up changes made by other instances"""
+        try:
+            since = self.begin_reload()
+            with metrics_service.time_dependency('mongo', 'find_schedules'):
+                docs = list(self.collection.find(
+                    {}, {'activeFrom': 1, 'activeUntil': 1, 'createdAt': 1, 'updatedAt': 1}
+                ))
+            self.load(docs, since)
+        except Exception as e:
+            metrics_service.error('schedule.reload_error', error=str(e))
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def _run(self):
+        next_reload = time.monotonic() + self.reload_interval
+        while not self._stop.is_set():
+            until_next = self.seconds_until_next()
+            timeout = next_reload - time.monotonic()
+            if until_next is not None:
+                timeout = min(timeout, until_next)
+            self._wakeup.wait(max(0.0, timeout))
+            self._wakeup.clear()
+
+            self.advance()
+            if time.monotonic() >= next_reload:
+                next_reload = time.monotonic() + self.reload_interval
+                self.reload()
+
+# Create singleton instance
+schedule_service = ScheduleService()
@@ -0,0 +1,20 @@
+import os
+import sys
+import pytest
+
+# The backend modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope='session')
+def app_module():
+    """The Flask app module, connected to the in-memory MongoDB stand-in"""
+    import pymongo
+    from benchmarks.standins import InMemoryMongoClient
+
+    original = pymongo.MongoClient
+    pymongo.MongoClient = InMemoryMongoClient
+    try:
+        import app
+    finally:
+        pymongo.MongoClient = original
+    return app
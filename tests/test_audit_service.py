@@ -0,0 +1,144 @@
+import os
+import time
+import threading
+import pytest
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+from audit_service import AuditService, INDEX_OPTIONS_CONFLICT
+from benchmarks.standins import InMemoryDatabase
+
+@pytest.fixture
+def db():
+    return InMemoryDatabase('test')
+
+@pytest.fixture
+def service(db, tmp_path):
+    service = AuditService()
+    service.flush_interval = 0.01
+    service.start(db, db['banners'], str(tmp_path))
+    yield service
+    service.stop()
+
+def snapshot(image_data=None, **fields):
+    return {'collectionId': 'c1', 'imageData': image_data, 'imageType': 'png', **fields}
+
+def block_history_writes(service):
+    """Make the writer hang inside insert_many until the returned event is set"""
+    release = threading.Event()
+    insert_many = service.history_collection.insert_many
+
+    def blocked(docs, ordered=True):
+        release.wait(5)
+        return insert_many(docs, ordered=ordered)
+
+    service.history_collection.insert_many = blocked
+    return release
+
+def test_same_image_is_stored_once_and_resolves_on_rollback(service):
+    banner_id = ObjectId()
+    for action in ('create', 'schedule', 'schedule'):
+        service.record(action, banner_id, snapshot('AAAA'))
+    service.record('replace', banner_id, snapshot('BBBB'))
+
+    history = service.history(banner_id)
+
+    assert len(list(service.images_collection.find())) == 2
+    assert all('imageData' not in event['snapshot'] for event in history)
+    assert len({event['snapshot']['imageRef'] for event in history}) == 2
+    assert service.restore_snapshot(history[-1])['imageData'] == 'AAAA'
+    assert service.restore_snapshot(history[0])['imageData'] == 'BBBB'
+
+def test_restore_snapshot_fails_once_image_expired(service):
+    banner_id = ObjectId()
+    service.record('create', banner_id, snapshot('AAAA'))
+    event = service.history(banner_id)[0]
+    service.images_collection.delete_many({})
+
+    with pytest.raises(LookupError):
+        service.restore_snapshot(event)
+
+def test_queue_is_bounded_by_bytes(service):
+    service.max_queue_bytes = 3000
+    release = block_history_writes(service)
+
+    kept = service.record('create', ObjectId(), snapshot('x' * 1000))
+    # Still counted while the writer is stuck on the first event
+    dropped = service.record('replace', ObjectId(), snapshot('y' * 1000))
+    release.set()
+    assert service.flush(timeout=5)
+
+    ids = {event['_id'] for event in service.history_collection.find()}
+    assert kept in ids and dropped not in ids
+    assert service.record('delete', ObjectId(), snapshot('z' * 1000)) is not None
+    assert service.flush(timeout=5)
+    assert len(ids) + 1 == len(list(service.history_collection.find()))
+
+def test_flush_times_out_instead_of_hanging(service):
+    banner_id = ObjectId()
+    service.record('create', banner_id, snapshot())
+    assert service.flush(timeout=5)
+
+    release = block_history_writes(service)
+    service.record('schedule', banner_id, snapshot())
+    service.flush_timeout = 0.05
+    started = time.monotonic()
+
+    # Returns what is already stored rather than waiting for the stuck writer
+    assert [event['action'] for event in service.history(banner_id)] == ['create']
+    assert time.monotonic() - started < 1
+    release.set()
+
+def test_prune_deletes_only_retired_unused_files(service, tmp_path):
+    for name in ('retired.png', 'in_use.png', 'recent.png', 'untracked.png'):
+        (tmp_path / name).write_bytes(b'x')
+        os.utime(tmp_path / name, (0, 0))
+    service.banners_collection.insert_one({'filename': 'in_use.png'})
+    for name in ('retired.png', 'in_use.png', 'recent.png'):
+        service.retire_upload(name)
+    assert service.flush(timeout=5)
+    service.retired_collection.update_many(
+        {'_id': {'$in': ['retired.png', 'in_use.png']}}, {'$set': {'retiredAt': 0}}
+    )
+
+    service.prune_retired_uploads()
+
+    assert sorted(os.listdir(tmp_path)) == ['in_use.png', 'recent.png', 'untracked.png']
+    assert sorted(doc['_id'] for doc in service.retired_collection.find()) == ['in_use.png', 'recent.png']
+
+def test_retire_deletes_right_away_without_writer(tmp_path):
+    service = AuditService()
+    service.upload_folder = str(tmp_path)
+    (tmp_path / 'old.png').write_bytes(b'x')
+
+    service.retire_upload('old.png')
+
+    assert not (tmp_path / 'old.png').exists()
+
+def test_ttl_conflict_falls_back_to_collmod(db):
+    collection = db['banner_history']
+    commands = []
+
+    def create_index(keys, **kwargs):
+        raise OperationFailure('Index with name: recordedAt_1 already exists with different options',
+                               code=INDEX_OPTIONS_CONFLICT)
+
+    collection.create_index = create_index
+    db.command = lambda *args, **kwargs: commands.append((args, kwargs))
+
+    AuditService._ensure_ttl_index(collection, 'recordedAt', 3600)
+
+    assert commands == [(
+        ('collMod', 'banner_history'),
+        {'index': {'keyPattern': {'recordedAt': 1}, 'expireAfterSeconds': 3600}}
+    )]
+
+def test_ttl_other_index_errors_propagate(db):
+    collection = db['banner_history']
+
+    def create_index(keys, **kwargs):
+        raise OperationFailure('not authorized', code=13)
+
+    collection.create_index = create_index
+
+    with pytest.raises(OperationFailure):
+        AuditService._ensure_ttl_index(collection, 'recordedAt', 3600)
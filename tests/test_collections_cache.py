@@ -0,0 +1,125 @@
+import time
+import threading
+import pytest
+
+class FakeShopify:
+    """Stands in for fetch_shopify_collections; `gate` holds fetches until set"""
+
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+        self.gate = threading.Event()
+        self.gate.set()
+        self.started = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        return [{'id': f'gid://shopify/Collection/{self.calls}', 'title': 'T', 'handle': 'h'}]
+
+@pytest.fixture
+def shopify(app_module, monkeypatch):
+    fake = FakeShopify()
+    monkeypatch.setattr(app_module, 'fetch_shopify_collections', fake)
+    monkeypatch.setattr(app_module, 'COLLECTIONS_CACHE_SECONDS', 30)
+    monkeypatch.setattr(app_module, 'COLLECTIONS_ERROR_CACHE_SECONDS', 5)
+    monkeypatch.setattr(app_module, '_collections_cache', {
+        'collections': None, 'body': None, 'etag': None, 'fetchedAt': 0.0,
+        'generation': 0, 'refreshing': False, 'error': None, 'errorAt': 0.0
+    })
+    return fake
+
+def in_thread(target, *args, **kwargs):
+    result = {}
+
+    def run():
+        try:
+            result['value'] = target(*args, **kwargs)
+        except Exception as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, result
+
+def expire(app_module):
+    app_module._collections_cache['fetchedAt'] = time.monotonic() - 60
+
+def test_concurrent_cold_callers_share_one_fetch(app_module, shopify):
+    shopify.gate.clear()
+    threads = [in_thread(app_module.get_cached_collections) for _ in range(5)]
+    assert shopify.started.wait(5)
+    shopify.gate.set()
+    for thread, _ in threads:
+        thread.join(5)
+
+    assert shopify.calls == 1
+    assert {result['value']['generation'] for _, result in threads} == {1}
+
+def test_fresh_cache_is_served_without_fetching(app_module, shopify):
+    first = app_module.get_cached_collections()
+    second = app_module.get_cached_collections()
+
+    assert shopify.calls == 1
+    assert second['etag'] == first['etag']
+    assert second['body'] == app_module.app.json.dumps({'collections': first['collections']}).encode('utf-8')
+
+def test_stale_list_is_served_while_another_caller_refreshes(app_module, shopify):
+    stale = app_module.get_cached_collections()
+    expire(app_module)
+    shopify.gate.clear()
+    refresher, refreshed = in_thread(app_module.get_cached_collections)
+    assert shopify.started.wait(5)
+
+    started = time.monotonic()
+    served = app_module.get_cached_collections()
+    assert time.monotonic() - started < 1
+    assert served['collections'] == stale['collections']
+
+    shopify.gate.set()
+    refresher.join(5)
+    assert refreshed['value']['generation'] == 2
+    assert shopify.calls == 2
+
+def test_failed_refresh_serves_stale_and_is_remembered(app_module, shopify):
+    stale = app_module.get_cached_collections()
+    expire(app_module)
+    shopify.error = RuntimeError('Shopify down')
+
+    assert app_module.get_cached_collections()['collections'] == stale['collections']
+    assert app_module.get_cached_collections()['collections'] == stale['collections']
+    # The second call falls inside the error window: no new fetch
+    assert shopify.calls == 2
+
+def test_failed_refresh_without_data_raises_within_error_window(app_module, shopify):
+    shopify.error = RuntimeError('Shopify down')
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match='Shopify down'):
+            app_module.get_cached_collections()
+    assert shopify.calls == 1
+
+    app_module._collections_cache['errorAt'] = time.monotonic() - 60
+    shopify.error = None
+    assert app_module.get_cached_collections()['generation'] == 1
+
+def test_force_waits_for_a_newer_generation(app_module, shopify):
+    app_module.get_cached_collections()
+    shopify.started.clear()
+    shopify.gate.clear()
+    first, first_result = in_thread(app_module.get_cached_collections, force=True)
+    assert shopify.started.wait(5)
+    second, second_result = in_thread(app_module.get_cached_collections, force=True)
+
+    time.sleep(0.05)
+    assert second.is_alive()
+    shopify.gate.set()
+    first.join(5)
+    second.join(5)
+
+    # The waiting caller is satisfied by the refresh already in flight
+    assert shopify.calls == 2
+    assert first_result['value']['generation'] == second_result['value']['generation'] == 2
@@ -0,0 +1,59 @@
+import time
+import smtplib
+import pytest
+import requests
+from pymongo.errors import ServerSelectionTimeoutError, AutoReconnect
+from health_service import HealthService
+
+SECRET = 'mongo-0.internal:27017'
+
+def refused():
+    try:
+        raise ConnectionRefusedError(111, 'Connection refused')
+    except ConnectionRefusedError as e:
+        try:
+            raise requests.ConnectionError(f'https://{SECRET}/graphql') from e
+        except requests.ConnectionError as wrapped:
+            return wrapped
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f'{status} for url https://{SECRET}', response=response)
+
+@pytest.mark.parametrize('error, code', [
+    (TimeoutError('Probe deadline exceeded'), 'timeout'),
+    (requests.ReadTimeout(SECRET), 'timeout'),
+    (ServerSelectionTimeoutError(f'{SECRET}: timed out, Topology Description: ...'), 'timeout'),
+    (refused(), 'connection_refused'),
+    (AutoReconnect(SECRET), 'connection_error'),
+    (ConnectionError('Database not connected'), 'connection_error'),
+    (http_error(401), 'http_401'),
+    (smtplib.SMTPResponseException(421, b'busy'), 'smtp_421'),
+    (ValueError('SMTP_HOST is not configured'), 'not_configured'),
+    (RuntimeError(f'Shopify API errors: {SECRET}'), 'error'),
+])
+def test_error_code(error, code):
+    assert HealthService.error_code(error) == code
+
+def test_report_hides_error_details():
+    service = HealthService()
+
+    def failing(timeout):
+        raise ServerSelectionTimeoutError(f'{SECRET}: timed out')
+
+    service.register('mongo', failing)
+    report = service.check()
+
+    assert report['status'] == 'not_ready'
+    assert report['dependencies']['mongo']['error'] == 'timeout'
+    assert SECRET not in str(report)
+
+def test_hung_probe_reports_timeout():
+    service = HealthService()
+    service.probe_timeout = 0.05
+    service.register('shopify', lambda timeout: time.sleep(1))
+
+    report = service.check()
+
+    assert report['dependencies']['shopify']['error'] == 'timeout'
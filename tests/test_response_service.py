@@ -0,0 +1,99 @@
+import gzip
+import json
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from bson import ObjectId
+from flask import Flask
+import response_service as response_module
+from response_service import FastJSONProvider, ResponseService
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+@pytest.fixture
+def service():
+    service = ResponseService()
+    service.min_size = 100
+    return service
+
+@pytest.fixture
+def fake_brotli(monkeypatch):
+    monkeypatch.setattr(response_module, 'brotli', SimpleNamespace(compress=lambda data, quality: b'br:' + data))
+
+def json_response(app, payload, status=200):
+    response = app.json.response(payload)
+    response.status_code = status
+    return response
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip, br', 'br'),
+    ('gzip;q=1, br;q=0.1', 'gzip'),
+    ('br;q=0, gzip', 'gzip'),
+    ('identity', None),
+    ('', None),
+])
+def test_negotiate_honours_q_values(app, service, fake_brotli, header, expected):
+    with app.test_request_context(headers={'Accept-Encoding': header}):
+        assert service._negotiate() == expected
+
+def test_negotiate_without_brotli_offers_gzip_only(app, service, monkeypatch):
+    monkeypatch.setattr(response_module, 'brotli', None)
+    with app.test_request_context(headers={'Accept-Encoding': 'br, gzip;q=0.5'}):
+        assert service._negotiate() == 'gzip'
+
+def test_compress_gzips_large_json(app, service):
+    payload = {'items': ['x' * 50] * 20}
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = service.compress(json_response(app, payload))
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.vary
+        assert json.loads(gzip.decompress(response.get_data())) == payload
+
+def test_compress_leaves_small_bodies_alone(app, service):
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = service.compress(json_response(app, {'ok': True}))
+
+        assert 'Content-Encoding' not in response.headers
+        assert 'Accept-Encoding' in response.vary
+
+def test_compress_skips_not_modified(app, service):
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = service.compress(app.response_class(status=304))
+
+        assert 'Content-Encoding' not in response.headers
+        assert not response.vary
+
+def test_compress_skips_other_content_types(app, service):
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = service.compress(app.response_class(b'\x89PNG' * 100, mimetype='image/png'))
+
+        assert 'Content-Encoding' not in response.headers
+
+@pytest.mark.parametrize('args, kwargs, expected', [
+    (({'a': 1},), {}, {'a': 1}),
+    ((1, 2), {}, [1, 2]),
+    ((), {'a': 1}, {'a': 1}),
+    ((), {}, None),
+])
+def test_json_response_arguments_match_jsonify(app, args, kwargs, expected):
+    with app.app_context():
+        response = app.json.response(*args, **kwargs)
+
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.get_data()) == expected
+
+def test_json_response_rejects_args_and_kwargs(app):
+    with app.app_context(), pytest.raises(TypeError):
+        app.json.response({'a': 1}, b=2)
+
+def test_json_serializes_objectid_and_datetime(app):
+    banner_id = ObjectId()
+    with app.app_context():
+        body = app.json.response({'_id': banner_id, 'at': datetime(2030, 1, 1, 12)}).get_data()
+
+    assert json.loads(body) == {'_id': str(banner_id), 'at': '2030-01-01T12:00:00'}
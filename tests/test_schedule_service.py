@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from bson import ObjectId
+from schedule_service import ScheduleService
+
+EPOCH = datetime(2030, 1, 1)
+
+class FakeClock:
+    """Epoch-seconds clock that only moves when told to"""
+
+    def __init__(self, start=EPOCH):
+        self.now = start.replace(tzinfo=timezone.utc).timestamp()
+
+    def __call__(self):
+        return self.now
+
+    def tick(self, seconds):
+        self.now += seconds
+
+def banner(active_from=None, active_until=None, created=0):
+    return {
+        '_id': ObjectId(),
+        'activeFrom': EPOCH + timedelta(seconds=active_from) if active_from is not None else None,
+        'activeUntil': EPOCH + timedelta(seconds=active_until) if active_until is not None else None,
+        'createdAt': EPOCH + timedelta(seconds=created),
+        'updatedAt': EPOCH + timedelta(seconds=created)
+    }
+
+def make_service():
+    clock = FakeClock()
+    return ScheduleService(clock=clock), clock
+
+def test_unscheduled_banner_is_always_active():
+    service, clock = make_service()
+    doc = banner()
+    service.upsert(doc)
+
+    assert service.active_ids() == (str(doc['_id']),)
+    assert service.seconds_until_next() is None
+    clock.tick(10 ** 9)
+    assert service.advance() is False
+    assert service.is_active(doc['_id'])
+
+def test_start_and_end_transitions_fire():
+    service, clock = make_service()
+    doc = banner(active_from=60, active_until=120)
+    service.upsert(doc)
+
+    assert service.active_ids() == ()
+    assert service.seconds_until_next() == 60
+
+    clock.tick(60)
+    assert service.advance() is True
+    assert service.is_active(doc['_id'])
+    assert service.seconds_until_next() == 60
+
+    clock.tick(59)
+    assert service.advance() is False
+    clock.tick(1)
+    assert service.advance() is True
+    assert not service.is_active(doc['_id'])
+    assert service.seconds_until_next() is None
+
+def test_active_ids_are_newest_first():
+    service, clock = make_service()
+    older, newer = banner(created=1), banner(created=2)
+    service.load([older, newer])
+
+    assert service.active_ids() == (str(newer['_id']), str(older['_id']))
+
+def test_rescheduling_invalidates_old_heap_entries():
+    service, clock = make_service()
+    doc = banner(active_from=60)
+    service.upsert(doc)
+    service.upsert({**doc, 'activeFrom': EPOCH + timedelta(seconds=300)})
+
+    assert service.seconds_until_next() == 300
+    clock.tick(60)
+    # The stale start at t+60 must not fire
+    assert service.advance() is False
+    assert not service.is_active(doc['_id'])
+
+    clock.tick(240)
+    assert service.advance() is True
+    assert service.is_active(doc['_id'])
+
+def test_removed_banner_leaves_no_pending_transitions():
+    service, clock = make_service()
+    doc = banner(active_from=60, active_until=120)
+    service.upsert(doc)
+    service.remove(doc['_id'])
+
+    assert service.seconds_until_next() is None
+    clock.tick(60)
+    assert service.advance() is False
+    assert service.active_ids() == ()
+
+def test_readding_removed_banner_ignores_its_old_transitions():
+    service, clock = make_service()
+    doc = banner(active_from=60)
+    service.upsert(doc)
+    service.remove(doc['_id'])
+    service.upsert({**doc, 'activeFrom': EPOCH + timedelta(seconds=300)})
+
+    assert service.seconds_until_next() == 300
+    clock.tick(60)
+    assert service.advance() is False
+
+def test_is_active_reflects_last_advance():
+    service, clock = make_service()
+    doc = banner(active_from=60)
+    service.upsert(doc)
+
+    clock.tick(60)
+    assert not service.is_active(doc['_id'])
+    service.active_ids()
+    assert service.is_active(doc['_id'])
+
+def test_reload_keeps_changes_made_while_reading():
+    service, clock = make_service()
+    kept, removed = banner(), banner()
+    service.load([kept, removed])
+
+    since = service.begin_reload()
+    # The reload read these documents before the changes below
+    stale_docs = [kept, removed]
+    service.upsert({**kept, 'activeFrom': EPOCH + timedelta(seconds=60)})
+    service.remove(removed['_id'])
+    service.load(stale_docs, since)
+
+    assert service.active_ids() == ()
+    assert service.seconds_until_next() == 60
+
+    # The next reload sees the stored state again
+    service.load([{**kept, 'activeFrom': EPOCH + timedelta(seconds=60)}], service.begin_reload())
+    clock.tick(60)
+    assert service.active_ids() == (str(kept['_id']),)
+
+def test_format_time_is_explicit_utc():
+    parsed = ScheduleService.parse_time('2099-01-01T02:00:00+02:00')
+
+    assert parsed == datetime(2099, 1, 1)
+    assert ScheduleService.format_time(parsed) == '2099-01-01T00:00:00Z'
+    assert ScheduleService.format_time(None) is None
+
+@pytest.mark.parametrize('value', ['9999-12-31T23:00:00-05:00', '0001-01-01T00:30:00+01:00'])
+def test_out_of_range_offsets_are_rejected_as_bad_input(app_module, value):
+    with pytest.raises(ValueError, match='Invalid activeFrom'):
+        app_module.parse_schedule({'activeFrom': value})
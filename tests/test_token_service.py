@@ -0,0 +1,33 @@
+import logging
+import jwt
+from metrics_service import metrics_service
+from token_service import TokenService
+from auth_service import AuthService
+
+JWT_VERIFY = (('dependency', 'jwt'), ('operation', 'verify'))
+
+def jwt_errors():
+    return metrics_service.snapshot('dependency_errors_total').get(JWT_VERIFY, 0)
+
+def test_rejected_tokens_are_not_dependency_errors():
+    service = TokenService()
+    before = jwt_errors()
+
+    assert service.verify_token('not-a-jwt')['valid'] is False
+    forged = jwt.encode({'email': 'a@b.c'}, 'another-secret-with-enough-length', algorithm='HS256')
+    assert service.verify_token(forged)['error'] == 'Invalid token'
+    assert service.verify_token(service.generate_token('a@b.c'))['valid'] is True
+
+    assert jwt_errors() == before
+
+def test_admin_list_is_logged_masked(monkeypatch, caplog):
+    monkeypatch.setenv('ADMIN_1', 'jane.doe@example.com')
+    monkeypatch.setenv('ADMIN_2', 'broken-entry')
+    monkeypatch.delenv('ADMIN_3', raising=False)
+
+    with caplog.at_level(logging.INFO, logger='multiyo'):
+        AuthService()
+
+    fields = [record.fields for record in caplog.records if record.getMessage() == 'auth.admins_loaded'][-1]
+    assert fields['count'] == 2
+    assert fields['admins'] == ['j******e@example.com', '***']
@@ -2,6 +2,7 @@ import os
 import jwt
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from metrics_service import metrics_service
 
 load_dotenv('.env')
 
@@ -24,13 +25,15 @@ class TokenService:
             token = jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
             return token
         except Exception as e:
-            print(f"Error generating token: {str(e)}")
+            metrics_service.error('jwt.encode_error', error=str(e))
             return None
     
     def verify_token(self, token):
         """Verify JWT token"""
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            # Expired/forged client tokens are expected; only real failures count as errors
+            with metrics_service.time_dependency('jwt', 'verify', expected=jwt.InvalidTokenError):
+                payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
             return {
                 'valid': True,
                 'email': payload.get('email'),